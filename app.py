@@ -1,14 +1,13 @@
 import streamlit as st
-import joblib
-import nltk
-import re
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
 import time
 import pandas as pd
 import os
 from datetime import datetime
 import json
+import csv
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import gspread
 from google.oauth2.service_account import Credentials
 
@@ -19,9 +18,19 @@ st.set_page_config(
     layout="centered"
 )
 
+# Imported after set_page_config: loading the pipeline may report NLTK errors
+from pipeline import MIN_TEXT_LENGTH, load_models, predict_news
+
 # GOOGLE SHEETS CONFIGURATION
 GOOGLE_SHEETS_URL = "https://docs.google.com/spreadsheets/d/16B6LHV0CakAfH2JOgxFv8F0Dv86_sMfCII5wGWvPYnk/edit?usp=sharing"  
 SHEET_NAME = "feedback_data"  
+SHEETS_BATCH_SIZE = 5  # Queued feedback rows are sent to the sheet in one request once this many wait
+SHEETS_FLUSH_INTERVAL = 30  # ...or once this many seconds have passed since the last send
+
+# LOCAL FEEDBACK BACKUP
+FEEDBACK_BACKUP_CSV = "feedback_data_backup.csv"
+FEEDBACK_COLUMNS = ['clean_text', 'label', 'timestamp', 'session_id']
+FEEDBACK_ARCHIVE_PARQUET = "feedback_data_archive.parquet"  # Compacted backup rows, for retraining
 
 # Initialize session state variables
 if 'feedback_submitted' not in st.session_state:
@@ -34,83 +43,14 @@ if 'current_prediction' not in st.session_state:
     st.session_state.current_prediction = None
 if 'current_text' not in st.session_state:
     st.session_state.current_text = ""
+if 'current_clean_text' not in st.session_state:
+    st.session_state.current_clean_text = ""
+if 'sheets_uploads' not in st.session_state:
+    st.session_state.sheets_uploads = []
 
-# Download NLTK data with comprehensive error handling
-@st.cache_resource
-def download_nltk_data():
-    """Download required NLTK data with caching"""
-    try:
-        # Try to find existing data first
-        nltk.data.find('tokenizers/punkt')
-        nltk.data.find('corpora/stopwords')
-        nltk.data.find('corpora/wordnet')
-        return True
-    except LookupError:
-        try:
-            # Download required data
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
-            nltk.download('wordnet', quiet=True)
-            # Try alternative punkt tokenizer for newer NLTK versions
-            nltk.download('punkt_tab', quiet=True)
-            return True
-        except Exception as e:
-            st.error(f"Failed to download NLTK data: {e}")
-            return False
-
-# Initialize NLTK data
-download_nltk_data()
-
-# Load the model and vectorizer
-@st.cache_resource
-def load_models():
-    """Load ML models with caching"""
-    try:
-        model = joblib.load("fake_news_model.pkl")
-        vectorizer = joblib.load("tfidf_vectorizer.pkl")
-        return model, vectorizer
-    except Exception as e:
-        st.error(f"Failed to load models: {e}")
-        return None, None
-
+# Cached inside the pipeline; called every run so a failed load is retried
 model, vectorizer = load_models()
 
-# Preprocessing setup
-@st.cache_resource
-def setup_preprocessing():
-    """Setup preprocessing tools with caching"""
-    lemmatizer = WordNetLemmatizer()
-    stop_words = set(stopwords.words("english"))
-    return lemmatizer, stop_words
-
-lemmatizer, stop_words = setup_preprocessing()
-
-def preprocess_text(text):
-    text = text.lower()
-    text = re.sub(r"http\S+|www\S+|https\S+", '', text)
-    text = re.sub(r'<.*?>', '', text)
-    text = re.sub(r"[^a-zA-Z]", ' ', text)
-    tokens = nltk.word_tokenize(text)
-    tokens = [lemmatizer.lemmatize(word) for word in tokens if word not in stop_words and len(word) > 2]
-    return " ".join(tokens)
-
-# Prediction function with probabilities
-def predict_news(text):
-    if model is None or vectorizer is None:
-        st.error("Models not loaded properly. Please refresh the page.")
-        return None, None, None
-        
-    clean_text = preprocess_text(text)
-    vector = vectorizer.transform([clean_text])
-    prediction = model.predict(vector)[0]
-    probabilities = model.predict_proba(vector)[0]
-    
-    # Assuming 0 = Fake, 1 = Real
-    fake_prob = probabilities[0] * 100
-    real_prob = probabilities[1] * 100
-    
-    return prediction, fake_prob, real_prob
-
 @st.cache_resource
 def setup_google_sheets():
     """Setup Google Sheets client with caching - Fixed for Streamlit secrets"""
@@ -126,12 +66,13 @@ def setup_google_sheets():
             # Access the gcp_service_account from Streamlit secrets
             credentials_dict = st.secrets["gcp_service_account"]
             
-            # Convert the AttrDict to a regular dictionary
-            credentials_info = dict(credentials_dict)
-            
-            # Fix the private_key formatting (replace \\n with actual newlines)
-            if "private_key" in credentials_info:
-                credentials_info["private_key"] = credentials_info["private_key"].replace("\\n", "\n")
+            # Fix the private_key formatting (replace \\n with actual newlines); a PEM body
+            # never contains a backslash, so only keys with escaped newlines need it.
+            # The secrets mapping is passed as-is and only copied when the key needs fixing.
+            credentials_info = credentials_dict
+            private_key = credentials_dict.get("private_key", "")
+            if "\\n" in private_key:
+                credentials_info = {**credentials_dict, "private_key": private_key.replace("\\n", "\n")}
             
             # Create credentials from the dictionary
             creds = Credentials.from_service_account_info(credentials_info, scopes=scope)
@@ -160,48 +101,137 @@ def extract_sheet_id_from_url(url):
     except Exception:
         return None
 
+@st.cache_resource
+def get_worksheet():
+    """Open the feedback worksheet once per process, creating it if needed; raises if
+    Sheets is unavailable (failures are not cached, so the next call retries)"""
+    client, setup_status = setup_google_sheets()
+    if setup_status != "success":
+        raise RuntimeError(f"Google Sheets not available ({setup_status})")
+    
+    sheet_id = extract_sheet_id_from_url(GOOGLE_SHEETS_URL)
+    if not sheet_id:
+        raise ValueError("Invalid Google Sheets URL")
+    
+    spreadsheet = client.open_by_key(sheet_id)
+    try:
+        return spreadsheet.worksheet(SHEET_NAME)
+    except gspread.WorksheetNotFound:
+        # Create the worksheet if it doesn't exist
+        worksheet = spreadsheet.add_worksheet(title=SHEET_NAME, rows=1000, cols=10)
+        worksheet.insert_row(FEEDBACK_COLUMNS, 1)
+        return worksheet
+
 @st.cache_data(ttl=60)  # Cache for 1 minute to avoid frequent API calls
-def load_google_sheets_data():
-    """Load data from Google Sheets with caching"""
+def load_google_sheets_count():
+    """Count feedback records in Google Sheets with caching"""
     if not GOOGLE_SHEETS_URL or GOOGLE_SHEETS_URL == "YOUR_GOOGLE_SHEETS_URL_HERE":
-        return pd.DataFrame(), "Google Sheets URL not configured"
+        return 0, "Google Sheets URL not configured"
     
     try:
         client, setup_status = setup_google_sheets()
         if setup_status != "success":
-            return pd.DataFrame(), setup_status
-        
-        # Extract sheet ID from URL
-        sheet_id = extract_sheet_id_from_url(GOOGLE_SHEETS_URL)
-        if not sheet_id:
-            return pd.DataFrame(), "Invalid Google Sheets URL"
-        
-        # Open the spreadsheet
-        spreadsheet = client.open_by_key(sheet_id)
-        
-        # Try to open the specific worksheet
-        try:
-            worksheet = spreadsheet.worksheet(SHEET_NAME)
-        except gspread.WorksheetNotFound:
-            # Create the worksheet if it doesn't exist
-            worksheet = spreadsheet.add_worksheet(title=SHEET_NAME, rows=1000, cols=10)
-            # Add headers
-            headers = ['clean_text', 'label', 'timestamp', 'session_id']
-            worksheet.insert_row(headers, 1)
-        
-        # Get all records
-        records = worksheet.get_all_records()
-        df = pd.DataFrame(records)
+            return 0, setup_status
         
-        return df, "success"
+        # Fetch only the short label column rather than every record; minus the header
+        return max(len(get_worksheet().col_values(2)) - 1, 0), "success"
         
     except gspread.exceptions.APIError as e:
-        return pd.DataFrame(), f"Google Sheets API error: {str(e)}"
+        get_worksheet.clear()
+        return 0, f"Google Sheets API error: {str(e)}"
     except Exception as e:
-        return pd.DataFrame(), f"Error loading Google Sheets data: {str(e)}"
+        return 0, f"Error loading Google Sheets data: {str(e)}"
+
+@st.cache_resource
+def get_feedback_csv_lock():
+    """Process-wide lock serializing writes to the local CSV backup across sessions"""
+    return threading.Lock()
+
+def append_feedback_to_csv(feedback_records, csv_filename=FEEDBACK_BACKUP_CSV):
+    """Append feedback records to the local CSV backup in one write, without rereading it"""
+    with get_feedback_csv_lock():
+        write_header = not os.path.exists(csv_filename) or os.path.getsize(csv_filename) == 0
+        with open(csv_filename, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(FEEDBACK_COLUMNS)
+            writer.writerows([record[column] for column in FEEDBACK_COLUMNS] for record in feedback_records)
+
+@st.cache_resource
+def get_feedback_buffer():
+    """Process-wide queue of feedback rows waiting to be sent to Google Sheets"""
+    buffer = {'rows': [], 'last_flush': time.time(), 'timer': None,
+              'lock': threading.Lock(), 'flush_lock': threading.Lock()}
+    # Send whatever is still queued when the server shuts down
+    atexit.register(flush_feedback_buffer, buffer)
+    return buffer
+
+def flush_feedback_buffer(buffer=None):
+    """Send all queued feedback rows to Google Sheets in one request; returns rows sent"""
+    if buffer is None:
+        buffer = get_feedback_buffer()
+    # Flushes run one at a time, but the queue lock is only held to swap the rows out,
+    # so submits from other sessions never wait on the Sheets round-trip
+    with buffer['flush_lock']:
+        with buffer['lock']:
+            rows, buffer['rows'] = buffer['rows'], []
+            buffer['last_flush'] = time.time()
+        if not rows:
+            return 0
+        try:
+            get_worksheet().append_rows(
+                rows, value_input_option='RAW', insert_data_option='INSERT_ROWS'
+            )
+        except Exception as e:
+            if isinstance(e, gspread.exceptions.APIError):
+                # Reopen the worksheet next time in case the cached handle went stale
+                get_worksheet.clear()
+            # Keep the rows for the next flush; they are already in the CSV backup
+            with buffer['lock']:
+                buffer['rows'][:0] = rows
+            raise
+        return len(rows)
+
+@st.cache_resource
+def get_sheets_executor():
+    """Background thread that sends queued feedback so the script never waits on Sheets"""
+    # One worker keeps uploads in submission order; the flush lock also covers the atexit flush
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="sheets-upload")
+
+def _start_flush_timer(buffer, executor):
+    """Arm a one-shot timer that sends the queue after the flush interval (caller holds the lock)"""
+    if buffer['timer'] is None:
+        buffer['timer'] = threading.Timer(SHEETS_FLUSH_INTERVAL, _timed_flush, (buffer, executor))
+        buffer['timer'].daemon = True
+        buffer['timer'].start()
+
+def _timed_flush(buffer, executor):
+    """Timer callback: send the queue, re-arming while rows remain (e.g. after a failed send)"""
+    def rearm(_future):
+        with buffer['lock']:
+            buffer['timer'] = None
+            if buffer['rows']:
+                _start_flush_timer(buffer, executor)
+    executor.submit(flush_feedback_buffer, buffer).add_done_callback(rearm)
+
+def queue_feedback_for_sheets(feedback_record):
+    """Queue a record for Google Sheets, starting a background send once the batch
+    is full or due; returns (future of the send or None, rows queued)"""
+    buffer = get_feedback_buffer()
+    executor = get_sheets_executor()
+    with buffer['lock']:
+        buffer['rows'].append([feedback_record[column] for column in FEEDBACK_COLUMNS])
+        pending = len(buffer['rows'])
+        due = (pending >= SHEETS_BATCH_SIZE
+               or time.time() - buffer['last_flush'] >= SHEETS_FLUSH_INTERVAL)
+        if not due:
+            # Rows must not wait for the next submit on a quiet server
+            _start_flush_timer(buffer, executor)
+    future = executor.submit(flush_feedback_buffer, buffer) if due else None
+    return future, pending
 
 def save_feedback_to_google_sheets(preprocessed_text, corrected_label):
-    """Save feedback data to Google Sheets and local session"""
+    """Save feedback to the local backup and queue it for Google Sheets"""
     try:
         # Create feedback record
         feedback_record = {
@@ -216,63 +246,97 @@ def save_feedback_to_google_sheets(preprocessed_text, corrected_label):
             st.session_state.feedback_data = []
         st.session_state.feedback_data.append(feedback_record)
         
+        # Write the local backup right away so rows queued for Sheets are never lost;
+        # a failed backup still lets the record reach Sheets
+        try:
+            append_feedback_to_csv([feedback_record])
+            backup_error = None
+        except Exception as csv_error:
+            backup_error = csv_error
+            st.session_state.feedback_warning = f"Local backup failed: {csv_error}"
+        
         # Try to save to Google Sheets
         try:
             client, setup_status = setup_google_sheets()
             if setup_status != "success":
-                # Fallback to local save
-                df = pd.DataFrame(st.session_state.feedback_data)
-                df.to_csv("feedback_data_backup.csv", index=False)
-                return True, f"Google Sheets not available ({setup_status}). Saved locally. Records: {len(df)}"
-            
-            # Extract sheet ID from URL
-            sheet_id = extract_sheet_id_from_url(GOOGLE_SHEETS_URL)
-            if not sheet_id:
-                return False, "Invalid Google Sheets URL"
-            
-            # Open the spreadsheet and worksheet
-            spreadsheet = client.open_by_key(sheet_id)
-            
-            try:
-                worksheet = spreadsheet.worksheet(SHEET_NAME)
-            except gspread.WorksheetNotFound:
-                # Create the worksheet if it doesn't exist
-                worksheet = spreadsheet.add_worksheet(title=SHEET_NAME, rows=1000, cols=10)
-                # Add headers
-                headers = ['clean_text', 'label', 'timestamp', 'session_id']
-                worksheet.insert_row(headers, 1)
-            
-            # Append the new record
-            row_data = [
-                feedback_record['clean_text'],
-                feedback_record['label'],
-                feedback_record['timestamp'],
-                feedback_record['session_id']
-            ]
-            worksheet.append_row(row_data)
+                if backup_error is not None:
+                    return False, f"Google Sheets not available ({setup_status}) and local backup failed: {backup_error}"
+                return True, f"Google Sheets not available ({setup_status}). Saved locally. Records: {len(st.session_state.feedback_data)}"
             
-            # Get total count
-            total_records = len(worksheet.get_all_records())
-            
-            return True, f"Feedback saved to Google Sheets! Total records: {total_records}"
+            # Sent in the background; a failure is reported on a later rerun
+            future, pending = queue_feedback_for_sheets(feedback_record)
+            saved = "saved locally" if backup_error is None else f"not saved locally (backup failed: {backup_error})"
+            if future is None:
+                return True, f"Feedback {saved} and queued for Google Sheets ({pending} pending)."
+            st.session_state.sheets_uploads.append(future)
+            return True, f"Feedback {saved}; sending {pending} queued records to Google Sheets."
                 
         except Exception as sheets_error:
-            # Fallback to local CSV
-            try:
-                df = pd.DataFrame(st.session_state.feedback_data)
-                df.to_csv("feedback_data_backup.csv", index=False)
-                return True, f"Google Sheets error, saved locally: {sheets_error}. Records: {len(df)}"
-            except Exception as csv_error:
-                return False, f"Failed to save feedback: {csv_error}"
+            if backup_error is not None:
+                return False, f"Google Sheets error: {sheets_error}; local backup failed: {backup_error}"
+            # The record is already in the local CSV backup
+            return True, f"Google Sheets error, saved locally: {sheets_error}. Records: {len(st.session_state.feedback_data)}"
         
     except Exception as e:
         return False, f"Failed to save feedback: {e}"
 
+def compact_feedback_backup(csv_filename=FEEDBACK_BACKUP_CSV, parquet_filename=FEEDBACK_ARCHIVE_PARQUET):
+    """Move the CSV backup's rows into the Parquet archive and empty the CSV; returns rows moved"""
+    # Hold the CSV lock so no record lands in the CSV between reading and truncating it
+    with get_feedback_csv_lock():
+        if not os.path.exists(csv_filename) or os.path.getsize(csv_filename) == 0:
+            return 0
+        
+        new_rows = pd.read_csv(csv_filename, dtype={'label': 'int64'}, keep_default_na=False)
+        archive = new_rows
+        if os.path.exists(parquet_filename):
+            archive = pd.concat([pd.read_parquet(parquet_filename), new_rows], ignore_index=True)
+        # Write to a temporary file first so a failed write never loses archived rows
+        temp_filename = parquet_filename + ".tmp"
+        archive.to_parquet(temp_filename, compression='zstd', index=False)
+        os.replace(temp_filename, parquet_filename)
+        open(csv_filename, 'w').close()
+        return len(new_rows)
+
+def is_feedback_admin():
+    """Admin tools are shown only when `feedback_admin = true` is set in Streamlit secrets"""
+    try:
+        return bool(st.secrets.get("feedback_admin", False))
+    except Exception:
+        return False
+
+@st.cache_data(max_entries=1)
+def _count_parquet_rows(parquet_filename, mtime_ns, size):
+    """Count rows in the Parquet archive; mtime and size are cache keys like _count_csv_rows"""
+    return len(pd.read_parquet(parquet_filename, columns=['label']))
+
+@st.cache_data(max_entries=1)
+def _count_csv_rows(csv_filename, mtime_ns, size):
+    """Count data rows in a CSV; mtime and size are cache keys so any write invalidates it"""
+    with open(csv_filename, 'rb') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+def count_local_feedback(csv_filename=FEEDBACK_BACKUP_CSV):
+    """Number of locally backed-up feedback records, in the CSV and the Parquet archive"""
+    total = 0
+    try:
+        stat = os.stat(csv_filename)
+        total += _count_csv_rows(csv_filename, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        pass
+    try:
+        stat = os.stat(FEEDBACK_ARCHIVE_PARQUET)
+        total += _count_parquet_rows(FEEDBACK_ARCHIVE_PARQUET, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        pass
+    return total
+
 def load_feedback_stats():
     """Load and display feedback statistics from Google Sheets and session"""
     stats = {
         'sheets_feedback': 0,
         'session_feedback': 0,
+        'local_feedback': 0,
         'total_feedback': 0,
         'sheets_status': 'Not configured'
     }
@@ -280,12 +344,15 @@ def load_feedback_stats():
     # Get session feedback count
     stats['session_feedback'] = len(st.session_state.get('feedback_data', []))
     
+    # Get local backup count (re-read only when the file changes)
+    stats['local_feedback'] = count_local_feedback()
+    
     # Try to get Google Sheets feedback count
     if GOOGLE_SHEETS_URL and GOOGLE_SHEETS_URL != "YOUR_GOOGLE_SHEETS_URL_HERE":
         try:
-            df, load_status = load_google_sheets_data()
-            if load_status == "success" and not df.empty:
-                stats['sheets_feedback'] = len(df)
+            sheets_count, load_status = load_google_sheets_count()
+            if load_status == "success" and sheets_count:
+                stats['sheets_feedback'] = sheets_count
                 stats['sheets_status'] = 'Connected'
             else:
                 stats['sheets_status'] = f'Error: {load_status}'
@@ -293,7 +360,7 @@ def load_feedback_stats():
             stats['sheets_status'] = f'Error: {str(e)}'
     
     # Calculate total (avoid double counting)
-    stats['total_feedback'] = max(stats['sheets_feedback'], stats['session_feedback'])
+    stats['total_feedback'] = max(stats['sheets_feedback'], stats['local_feedback'], stats['session_feedback'])
     
     return stats
 
@@ -309,300 +376,15 @@ def show_True_data():
 if 'session_id' not in st.session_state:
     st.session_state.session_id = f"session_{int(time.time())}"
 
-# CSS with improved input label styling and coffee-colored radio buttons
-st.markdown("""
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Crimson+Text:wght@400;600&family=Source+Serif+Pro:wght@400;600&display=swap');
-        
-        .stApp {
-            background-color: #fdf6e3;
-            color: #2c1810;
-        }
-        
-        #MainMenu {visibility: hidden;}
-        footer {visibility: hidden;}
-        header {visibility: hidden;}
-        
-        .main-header {
-            text-align: center;
-            padding: 2rem 0;
-            border-bottom: 3px solid #d4a574;
-            margin-bottom: 2rem;
-        }
-        
-        .main-title {
-            font-family: 'Crimson Text', serif;
-            font-size: 2.5rem;
-            font-weight: 600;
-            color: #8b4513;
-            margin: 0;
-            text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-        }
-        
-        .subtitle {
-            font-family: 'Source Serif Pro', serif;
-            font-size: 1rem;
-            color: #a0522d;
-            margin-top: 0.5rem;
-            font-style: italic;
-        }
-        
-        .input-container {
-            background-color: #faf0e6;
-            padding: 1.5rem;
-            border-radius: 10px;
-            border: 2px solid #deb887;
-            margin: 1.5rem 0;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }
-        
-        .input-label {
-            font-family: 'Crimson Text', serif;
-            font-size: 1.3rem;
-            color: #8b4513;
-            margin-bottom: 1rem;
-            font-weight: 600;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-            padding: 0.8rem 0;
-            border-bottom: 2px solid #e6d3b7;
-            background: linear-gradient(135deg, #fff8e7 0%, #f5e6d3 100%);
-            border-radius: 8px;
-            padding-left: 1rem;
-            box-shadow: inset 0 1px 3px rgba(0,0,0,0.1);
-        }
-        
-        .input-label::before {
-            content: "📝";
-            font-size: 1.4rem;
-            margin-right: 0.3rem;
-        }
-        
-        .stButton > button {
-            background-color: #cd853f;
-            color: white;
-            border: none;
-            padding: 0.7rem 2rem;
-            border-radius: 5px;
-            font-family: 'Source Serif Pro', serif;
-            font-size: 1rem;
-            font-weight: 600;
-            width: 100%;
-            margin-top: 1rem;
-            transition: background-color 0.3s;
-        }
-        
-        .stButton > button:hover {
-            background-color: #a0522d;
-        }
-        
-        .result-box {
-            padding: 1.5rem;
-            border-radius: 8px;
-            margin: 1.5rem 0;
-            text-align: center;
-            font-family: 'Source Serif Pro', serif;
-        }
-        
-        .result-real {
-            background-color: #f0f8f0;
-            border: 2px solid #228b22;
-            color: #006400;
-        }
-        
-        .result-fake {
-            background-color: #fdf0f0;
-            border: 2px solid #cd5c5c;
-            color: #8b0000;
-        }
-        
-        .result-title {
-            font-size: 1.4rem;
-            font-weight: 600;
-            margin-bottom: 0.5rem;
-        }
-        
-        .stTextArea textarea {
-            font-family: 'Source Serif Pro', serif;
-            border: 2px solid #deb887;
-            border-radius: 8px;
-            background-color: #fffef7;
-            color: #2c1810 !important;
-            font-size: 14px;
-            cursor: text;
-            padding: 0.8rem;
-            transition: border-color 0.3s, box-shadow 0.3s;
-        }
-        
-        .stTextArea textarea::placeholder {
-            color: #8b7355 !important;
-            opacity: 0.7;
-        }
-        
-        .stTextArea textarea:focus {
-            border-color: #cd853f;
-            outline: none;
-            box-shadow: 0 0 8px rgba(205, 133, 63, 0.4);
-            cursor: text;
-        }
-        
-        .stTextArea textarea:focus::placeholder {
-            opacity: 0.3;
-        }
-        
-        .stWarning {
-            background-color: #fff3cd;
-            border: 1px solid #ffeaa7;
-            border-radius: 5px;
-        }
-        
-        /* Coffee-colored radio buttons styling */
-        .stRadio > div {
-            background-color: #f9f2e7;
-            padding: 1rem;
-            border-radius: 8px;
-            border: 2px solid #deb887;
-            margin: 0.5rem 0;
-        }
-        
-        /* Radio button title styling */
-        .stRadio > div > label > div[data-testid="stMarkdownContainer"] > p {
-            color: #654321 !important;
-            font-family: 'Crimson Text', serif !important;
-            font-weight: 600 !important;
-            font-size: 1.1rem !important;
-        }
-        
-        /* Radio button options text styling - target multiple selectors */
-        .stRadio div[role="radiogroup"] label,
-        .stRadio div[role="radiogroup"] label span,
-        .stRadio div[role="radiogroup"] label div,
-        .stRadio div[role="radiogroup"] label p {
-            color: #654321 !important;
-            font-family: 'Source Serif Pro', serif !important;
-            font-weight: 500 !important;
-            font-size: 1rem !important;
-        }
-        
-        /* Radio button container styling */
-        .stRadio div[role="radiogroup"] label {
-            background-color: #fff8f0 !important;
-            padding: 0.8rem 1rem !important;
-            border-radius: 8px !important;
-            margin: 0.3rem 0 !important;
-            border: 2px solid #e6d3b7 !important;
-            transition: all 0.3s ease !important;
-            display: flex !important;
-            align-items: center !important;
-        }
-        
-        .stRadio div[role="radiogroup"] label:hover {
-            background-color: #f5e6d3 !important;
-            border-color: #cd853f !important;
-            transform: translateY(-1px) !important;
-            box-shadow: 0 2px 8px rgba(205, 133, 63, 0.2) !important;
-        }
-        
-        /* Ensure radio button text is coffee colored */
-        .stRadio [data-testid="stMarkdownContainer"] p {
-            color: #654321 !important;
-        }
-        
-        /* Feedback container styling */
-        .feedback-container {
-            background-color: #f9f2e7;
-            padding: 1.5rem;
-            border-radius: 10px;
-            border: 2px solid #deb887;
-            margin: 1.5rem 0;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }
-        
-        .feedback-title {
-            font-family: 'Crimson Text', serif;
-            font-size: 1.3rem;
-            color: #8b4513;
-            font-weight: 600;
-            margin-bottom: 1rem;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-        
-        .feedback-title::before {
-            content: "💭";
-            font-size: 1.4rem;
-        }
-        
-        .stats-container {
-            background-color: #e8f5e8;
-            padding: 1rem;
-            border-radius: 8px;
-            border: 2px solid #90ee90;
-            margin: 1rem 0;
-            font-family: 'Source Serif Pro', serif;
-            color: #2d5a2d;
-        }
-        
-        .sheets-status-connected {
-            background-color: #d4edda;
-            color: #155724;
-            padding: 0.5rem 1rem;
-            border-radius: 5px;
-            font-weight: 600;
-            display: inline-block;
-            margin: 0.5rem 0;
-        }
-        
-        .sheets-status-error {
-            background-color: #f8d7da;
-            color: #721c24;
-            padding: 0.5rem 1rem;
-            border-radius: 5px;
-            font-weight: 600;
-            display: inline-block;
-            margin: 0.5rem 0;
-        }
-        
-        .footer-note {
-            margin-top: 2rem;
-            padding: 1rem;
-            background-color: #f5f5dc;
-            border-radius: 5px;
-            border-left: 4px solid #cd853f;
-            font-family: 'Source Serif Pro', serif;
-            font-size: 0.9rem;
-            color: #654321;
-            font-style: italic;
-        }
-        
-        /* Toast notification styling */
-        .toast-success {
-            background-color: #d4edda;
-            color: #155724;
-            padding: 1rem;
-            border-radius: 8px;
-            border: 1px solid #c3e6cb;
-            margin: 1rem 0;
-            font-family: 'Source Serif Pro', serif;
-            font-weight: 500;
-            text-align: center;
-            animation: slideIn 0.5s ease-out;
-        }
-        
-        @keyframes slideIn {
-            from {
-                opacity: 0;
-                transform: translateY(-20px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-    </style>
-""", unsafe_allow_html=True)
+# CSS (style.css) with improved input label styling and coffee-colored radio buttons
+@st.cache_resource
+def load_css():
+    """Read the stylesheet once per process; a resource, so reruns reuse the string uncopied"""
+    with open("style.css", encoding="utf-8") as f:
+        return f"<style>{f.read()}</style>"
+
+# st.html sends the style block as-is, skipping the markdown parser
+st.html(load_css())
 
 # Header
 st.markdown("""
@@ -612,169 +394,216 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-# Display feedback statistics if available
-stats = load_feedback_stats()
-if stats:
+# Feedback statistics refresh on their own timer as a fragment, so an expired
+# Sheets count is usually refetched there rather than during analyze/submit reruns
+@st.fragment(run_every="60s")
+def show_feedback_stats():
+    stats = load_feedback_stats()
+    # Read by the footer, which sits outside the fragment
+    st.session_state.sheets_status = stats['sheets_status']
     sheets_status_class = "sheets-status-connected" if stats['sheets_status'] == 'Connected' else "sheets-status-error"
     
-    st.markdown(f"""
-        <div class="stats-container">
-            <strong>📊 Community Feedback Stats:</strong><br>
-            • Total Feedback Received: {stats['total_feedback']}<br>
-            • Google Sheets Records: {stats['sheets_feedback']}<br>
-            • Your Session Feedback: {stats['session_feedback']}<br>
-            • Google Sheets Status: <span class="{sheets_status_class}">{stats['sheets_status']}</span><br>
-            • Your feedback helps improve our model for everyone!
-        </div>
-    """, unsafe_allow_html=True)
+    with st.expander("📊 Community Feedback Stats", expanded=False):
+        st.markdown(f"""
+            <div class="stats-container">
+                • Total Feedback Received: {stats['total_feedback']}<br>
+                • Google Sheets Records: {stats['sheets_feedback']}<br>
+                • Local Backup Records: {stats['local_feedback']}<br>
+                • Your Session Feedback: {stats['session_feedback']}<br>
+                • Google Sheets Status: <span class="{sheets_status_class}">{stats['sheets_status']}</span><br>
+                • Your feedback helps improve our model for everyone!
+            </div>
+        """, unsafe_allow_html=True)
+
+show_feedback_stats()
 
 # Configuration warning if Google Sheets not set up
 if GOOGLE_SHEETS_URL == "YOUR_GOOGLE_SHEETS_URL_HERE":
     st.warning("⚠️ Google Sheets integration not configured. Please set your Google Sheets URL and credentials.")
 
-# Input section
-st.markdown("""
-    <div class="input-container">
-        <div class="input-label">Enter news content to verify</div>
-    </div>
-""", unsafe_allow_html=True)
+# Feedback buttons act in on_click callbacks, which run before the rerun their click
+# triggers, so the panel redraws in its new state without an explicit st.rerun()
+def submit_feedback():
+    """Save the selected correction and switch the panel to the thank-you state"""
+    corrected_label = 1 if st.session_state.feedback_radio == "It was Real News" else 0
+    
+    # Save feedback to Google Sheets and session
+    success, message = save_feedback_to_google_sheets(
+        preprocessed_text=st.session_state.current_clean_text,
+        corrected_label=corrected_label
+    )
+    
+    if success:
+        # Set session state to show success message and ask the panel for a full rerun
+        # so the stats pick up the new record (the Sheets upload runs in the background)
+        st.session_state.feedback_submitted = True
+        st.session_state.show_success = True
+        st.session_state.refresh_stats = True
+    else:
+        # The error message already covers a failed local backup
+        st.session_state.pop('feedback_warning', None)
+        st.session_state.feedback_error = message
 
-input_text = st.text_area(
-    "Text to analyze:",
-    height=150,
-    placeholder="Paste your news article, headline, or any text content here...",
-    label_visibility="collapsed",
-    key="news_input"
-)
+def reset_feedback():
+    """Bring the feedback form back for another correction"""
+    st.session_state.feedback_submitted = False
+    st.session_state.show_success = False
 
-# Sample data buttons
-st.markdown("**Try with sample data:**")
-col1, col2, col3 = st.columns([1, 1, 2])
-
-with col1:
-    if st.button("📰 Copy True News Sample"):
-        sample_text = show_True_data()
-        st.text_area("Copy this sample text:", value=sample_text, height=100, key="true_sample_display")
-        st.info("👆 Select all text above and copy it (Ctrl+C), then paste into the main input area.")
-
-with col2:
-    if st.button("🚨 Copy Fake News Sample"):
-        sample_text = show_fake_data()
-        st.text_area("Copy this sample text:", value=sample_text, height=100, key="fake_sample_display")
-        st.info("👆 Select all text above and copy it (Ctrl+C), then paste into the main input area.")
-
-if st.button("🔍 Analyze Content"):
-    if input_text.strip() == "":
-        st.warning("⚠️ Please enter some content to analyze.")
-    elif model is None or vectorizer is None:
-        st.error("⚠️ Models are not loaded properly. Please refresh the page and try again.")
-    else:
-        with st.spinner('📊 Analyzing content...'):
-            time.sleep(1)
-            result = predict_news(input_text)
-            
-        if result[0] is not None:
-            # Store results in session state
-            st.session_state.analysis_done = True
-            st.session_state.current_prediction = result
-            st.session_state.current_text = input_text
-            st.session_state.feedback_submitted = False
-            st.session_state.show_success = False
-
-# Display results if analysis was done
-if st.session_state.analysis_done and st.session_state.current_prediction:
-    prediction, fake_prob, real_prob = st.session_state.current_prediction
+# Input, results and the feedback form are one fragment: analyzing and giving
+# feedback rerun only this panel, not the CSS, header and stats around it
+@st.fragment
+def show_analysis_panel():
+    # A submit only reruns this fragment; rerun the whole app once so the stats
+    # expander shows the new session and local backup counts
+    if st.session_state.pop('refresh_stats', False):
+        st.rerun()
     
-    if prediction==0:  # Fake
-        st.markdown(f"""
-            <div class="result-box result-fake">
-                <div class="result-title">🚨 LIKELY FAKE NEWS</div>
-                <p>This content shows characteristics of misleading information.</p>
-            </div>
-        """, unsafe_allow_html=True)
-        st.markdown("**Confidence Levels:**")
-        st.write(f"🚨 Fake: **{fake_prob:.1f}%**")
-        st.progress(fake_prob/100)
-        st.write(f"✅ Authentic: **{real_prob:.1f}%**")
-        st.progress(real_prob/100)
-    else:  # Real
-        st.markdown(f"""
-            <div class="result-box result-real">
-                <div class="result-title">✅ LIKELY AUTHENTIC</div>
-                <p>This content appears to follow patterns of legitimate news.</p>
-            </div>
-        """, unsafe_allow_html=True)
-        st.markdown("**Confidence Levels:**")
-        st.write(f"✅ Authentic: **{real_prob:.1f}%**")
-        st.progress(real_prob/100)
-        st.write(f"🚨 Fake: **{fake_prob:.1f}%**")
-        st.progress(fake_prob/100)
-
-    # Enhanced Human Feedback Section
+    # Report background Sheets uploads started by this session that have since failed;
+    # checked here because analyze and submit only rerun this fragment
+    for future in [f for f in st.session_state.sheets_uploads if f.done()]:
+        st.session_state.sheets_uploads.remove(future)
+        if future.exception() is not None:
+            st.warning(f"⚠️ Could not send feedback to Google Sheets (kept in the local backup): {future.exception()}")
+    
+    # Input section
     st.markdown("""
-        <div class="feedback-container">
-            <div class="feedback-title">Help us improve our model</div>
+        <div class="input-container">
+            <div class="input-label">Enter news content to verify</div>
         </div>
     """, unsafe_allow_html=True)
 
-    # Show success message if feedback was just submitted
-    if st.session_state.show_success:
+    input_text = st.text_area(
+        "Text to analyze:",
+        height=150,
+        placeholder="Paste your news article, headline, or any text content here...",
+        label_visibility="collapsed",
+        key="news_input"
+    )
+
+    # Sample data buttons
+    st.markdown("**Try with sample data:**")
+    col1, col2, col3 = st.columns([1, 1, 2])
+
+    with col1:
+        if st.button("📰 Copy True News Sample"):
+            sample_text = show_True_data()
+            st.text_area("Copy this sample text:", value=sample_text, height=100, key="true_sample_display")
+            st.info("👆 Select all text above and copy it (Ctrl+C), then paste into the main input area.")
+
+    with col2:
+        if st.button("🚨 Copy Fake News Sample"):
+            sample_text = show_fake_data()
+            st.text_area("Copy this sample text:", value=sample_text, height=100, key="fake_sample_display")
+            st.info("👆 Select all text above and copy it (Ctrl+C), then paste into the main input area.")
+
+    if st.button("🔍 Analyze Content"):
+        if input_text.strip() == "":
+            st.warning("⚠️ Please enter some content to analyze.")
+        elif len(input_text.strip()) < MIN_TEXT_LENGTH:
+            st.warning(f"⚠️ Please enter at least {MIN_TEXT_LENGTH} characters so there is enough content to analyze.")
+        elif model is None or vectorizer is None:
+            st.error("⚠️ Models are not loaded properly. Please refresh the page and try again.")
+        else:
+            with st.spinner('📊 Analyzing content...'):
+                result = predict_news(input_text)
+            
+            if result[0] is not None:
+                # Store results in session state
+                st.session_state.analysis_done = True
+                st.session_state.current_prediction = result[:3]
+                st.session_state.current_text = input_text
+                st.session_state.current_clean_text = result[3]
+                st.session_state.feedback_submitted = False
+                st.session_state.show_success = False
+
+    # Display results if analysis was done
+    if st.session_state.analysis_done and st.session_state.current_prediction:
+        prediction, fake_prob, real_prob = st.session_state.current_prediction
+    
+        if prediction==0:  # Fake
+            st.markdown(f"""
+                <div class="result-box result-fake">
+                    <div class="result-title">🚨 LIKELY FAKE NEWS</div>
+                    <p>This content shows characteristics of misleading information.</p>
+                </div>
+            """, unsafe_allow_html=True)
+            st.markdown("**Confidence Levels:**")
+            st.write(f"🚨 Fake: **{fake_prob:.1f}%**")
+            st.progress(fake_prob/100)
+            st.write(f"✅ Authentic: **{real_prob:.1f}%**")
+            st.progress(real_prob/100)
+        else:  # Real
+            st.markdown(f"""
+                <div class="result-box result-real">
+                    <div class="result-title">✅ LIKELY AUTHENTIC</div>
+                    <p>This content appears to follow patterns of legitimate news.</p>
+                </div>
+            """, unsafe_allow_html=True)
+            st.markdown("**Confidence Levels:**")
+            st.write(f"✅ Authentic: **{real_prob:.1f}%**")
+            st.progress(real_prob/100)
+            st.write(f"🚨 Fake: **{fake_prob:.1f}%**")
+            st.progress(fake_prob/100)
+
+        # Enhanced Human Feedback Section
         st.markdown("""
-            <div class="toast-success">
-                🎉 Thank you for your valuable feedback! Your input has been recorded and will be used to retrain our model in the next update. Together, we're making news verification more reliable!
+            <div class="feedback-container">
+                <div class="feedback-title">Help us improve our model</div>
             </div>
         """, unsafe_allow_html=True)
-        st.success("✅ Feedback successfully recorded!")
-
-    # Only show feedback form if not recently submitted
-    if not st.session_state.feedback_submitted:
-        feedback = st.radio(
-            "Was our prediction incorrect? Your feedback helps us improve:",
-            options=["No Feedback", "It was Real News", "It was Fake News"],
-            index=0,
-            horizontal=True,
-            key="feedback_radio"
-        )
-
-        # Submit button for feedback - only show when feedback is selected
-        if feedback != "No Feedback":
-            st.markdown("---")  # Add a separator
-            col1, col2, col3 = st.columns([1, 2, 1])
-            with col2:
-                submit_clicked = st.button("📤 Submit Feedback", key="submit_feedback")
+
+        # Show success message if feedback was just submitted
+        if st.session_state.show_success:
+            st.markdown("""
+                <div class="toast-success">
+                    🎉 Thank you for your valuable feedback! Your input has been recorded and will be used to retrain our model in the next update. Together, we're making news verification more reliable!
+                </div>
+            """, unsafe_allow_html=True)
+            st.success("✅ Feedback successfully recorded!")
+            feedback_warning = st.session_state.pop('feedback_warning', None)
+            if feedback_warning:
+                st.warning(f"⚠️ {feedback_warning}")
+
+        # Only show feedback form if not recently submitted
+        if not st.session_state.feedback_submitted:
+            feedback = st.radio(
+                "Was our prediction incorrect? Your feedback helps us improve:",
+                options=["No Feedback", "It was Real News", "It was Fake News"],
+                index=0,
+                horizontal=True,
+                key="feedback_radio"
+            )
+
+            # Submit button for feedback - only show when feedback is selected
+            if feedback != "No Feedback":
+                st.markdown("---")  # Add a separator
+                col1, col2, col3 = st.columns([1, 2, 1])
+                with col2:
+                    st.button("📤 Submit Feedback", key="submit_feedback", on_click=submit_feedback)
             
-            # Only process feedback when submit button is clicked
-            if submit_clicked:
-                corrected_label = 1 if feedback == "It was Real News" else 0
-                clean_text = preprocess_text(st.session_state.current_text)
-                
-                # Save feedback to Google Sheets and session
-                success, message = save_feedback_to_google_sheets(
-                    preprocessed_text=clean_text,
-                    corrected_label=corrected_label
-                )
-                
-                if success:
-                    # Set session state to show success message
-                    st.session_state.feedback_submitted = True
-                    st.session_state.show_success = True
-                    # Clear cache to refresh stats
-                    st.cache_data.clear()
-                    st.rerun()
+                feedback_error = st.session_state.pop('feedback_error', None)
+                if feedback_error:
+                    st.error(f"⚠️ {feedback_error}")
+                # Show instruction text when feedback is selected but not yet submitted
                 else:
-                    st.error(f"⚠️ {message}")
-            
-            # Show instruction text when feedback is selected but not yet submitted
-            else:
-                st.info("👆 Please click 'Submit Feedback' to confirm your selection and help improve our model.")
-    else:
-        # Show a message that feedback was received and allow new feedback
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col2:
-            if st.button("🔄 Provide New Feedback", key="new_feedback"):
-                st.session_state.feedback_submitted = False
-                st.session_state.show_success = False
-                st.rerun()
+                    st.info("👆 Please click 'Submit Feedback' to confirm your selection and help improve our model.")
+        else:
+            # Show a message that feedback was received and allow new feedback
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col2:
+                st.button("🔄 Provide New Feedback", key="new_feedback", on_click=reset_feedback)
+
+show_analysis_panel()
+
+# Admin tools, enabled through Streamlit secrets
+if is_feedback_admin():
+    with st.expander("🛠️ Admin"):
+        if st.button("🗜️ Compact Local Feedback Backup", key="compact_feedback"):
+            try:
+                moved = compact_feedback_backup()
+                st.success(f"Moved {moved} records from {FEEDBACK_BACKUP_CSV} to {FEEDBACK_ARCHIVE_PARQUET}")
+            except Exception as e:
+                st.error(f"⚠️ Failed to compact feedback backup: {e}")
 
 # Footer note with Google Sheets integration information
 st.markdown(f"""
@@ -782,6 +611,6 @@ st.markdown(f"""
         <strong>📌 Important:</strong> This tool provides AI-based guidance and records user feedback for model improvements. 
         <br><br>
         <strong>📊 Google Sheets Integration:</strong> 
-        {'✅ Connected - Feedback is being saved to your Google Sheets.' if stats and stats.get('sheets_status') == 'Connected' else '⚠️ Not Connected - Feedback is being stored locally only.'}
+        {'✅ Connected - Feedback is being saved to your Google Sheets.' if st.session_state.get('sheets_status') == 'Connected' else '⚠️ Not Connected - Feedback is being stored locally only.'}
     </div>
 """, unsafe_allow_html=True)
\ No newline at end of file